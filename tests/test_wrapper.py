@@ -1,245 +1,522 @@
+import contextlib
+import functools
 import importlib.machinery
 import importlib.util
+import io
 import json
 import os
+import shutil
 import subprocess
 import sys
 import tempfile
+import threading
 import time
 import unittest
-from multiprocessing import Event, get_context
 from pathlib import Path
+from unittest import mock
 
 WRAPPER_PATH = Path(__file__).resolve().parents[1] / "python3"
 
+_MODULE_TMPDIR: str | None = None
+# Reference venv built once in setUpModule and handed to the wrapper via PYWRAP_VENV_TEMPLATE.
+_TEMPLATE_VENV: Path | None = None
+
+
+def _exec_venv_python(path: str, args: list[str], *, capture: bool = True) -> None:
+    # Stand-in for os.execv: run the venv interpreter and exit with its status,
+    # so the calling test process survives the hand-off. Test-opened fds are
+    # non-inheritable (PEP 446), so close_fds=False is safe and lets CPython use
+    # posix_spawn instead of fork + an fd-closing sweep.
+    output = None if capture else subprocess.DEVNULL
+    result = subprocess.run(args, executable=path, stdout=output, stderr=output, close_fds=False)
+    raise SystemExit(result.returncode)
+
+
+def _redirect_fd(stack: contextlib.ExitStack, fd: int, target) -> None:
+    # Subprocesses the wrapper starts (venv, pip, cp) write to the real fds, not
+    # sys.stdout/sys.stderr, so redirect at the OS level.
+    saved = os.dup(fd)
+    stack.callback(os.close, saved)
+    stack.callback(os.dup2, saved, fd)
+    os.dup2(target.fileno(), fd)
+
+
+def _invoke_in_process(
+    module, cwd: str, env: dict, args: list[str], *, capture: bool = True
+) -> subprocess.CompletedProcess:
+    prev_cwd = os.getcwd()
+    with contextlib.ExitStack() as files:
+        if capture:
+            stdout = files.enter_context(tempfile.TemporaryFile())
+            stderr = files.enter_context(tempfile.TemporaryFile())
+        else:
+            # nothing is read back, so skip the temp files and the decode
+            stdout = stderr = files.enter_context(open(os.devnull, "wb"))
+        with contextlib.ExitStack() as stack:
+            stack.enter_context(mock.patch.dict(os.environ, env, clear=True))
+            execv = functools.partial(_exec_venv_python, capture=capture)
+            stack.enter_context(mock.patch.object(module.os, "execv", execv))
+            sys.stdout.flush()
+            sys.stderr.flush()
+            _redirect_fd(stack, 1, stdout)
+            _redirect_fd(stack, 2, stderr)
+            for target, redirect in ((stdout, contextlib.redirect_stdout), (stderr, contextlib.redirect_stderr)):
+                stream = stack.enter_context(open(target.fileno(), "w", encoding="utf-8", buffering=1, closefd=False))
+                stack.enter_context(redirect(stream))
+            os.chdir(cwd)
+            stack.callback(os.chdir, prev_cwd)
+            try:
+                returncode = module.main(args)
+            except SystemExit as exc:
+                returncode = 0 if exc.code is None else exc.code
+            # same mapping as the wrapper's __main__ block, so failures keep their output
+            except subprocess.CalledProcessError as exc:
+                print(f"[pywrap] command failed: {exc}", file=sys.stderr)
+                returncode = exc.returncode
+            except Exception as exc:
+                print(f"[pywrap] error: {exc}", file=sys.stderr)
+                returncode = 1
+        if not capture:
+            return subprocess.CompletedProcess(args, returncode, "", "")
+        stdout.seek(0)
+        stderr.seek(0)
+        return subprocess.CompletedProcess(
+            args, returncode, stdout.read().decode(errors="replace"), stderr.read().decode(errors="replace")
+        )
 
-def _run_wrapper(wrapper_path: str, cwd: str, env: dict, args: list[str], queue) -> None:
-    result = subprocess.run(
-        [sys.executable, wrapper_path, *args],
-        cwd=cwd,
-        env=env,
-        capture_output=True,
-        text=True,
-    )
-    queue.put((result.returncode, result.stdout, result.stderr))
-
-
-def _hold_lock(wrapper_path: str, lock_path: str, ready: Event, hold_sec: float) -> None:
-    loader = importlib.machinery.SourceFileLoader("pywrap", wrapper_path)
-    spec = importlib.util.spec_from_loader(loader.name, loader)
-    module = importlib.util.module_from_spec(spec)
-    loader.exec_module(module)
 
+def _hold_lock(module, lock_path: str, ready: threading.Event, release: threading.Event) -> None:
+    # OS file locks belong to the open file description (POSIX) or the process
+    # (Windows), so holding one from a thread still blocks a wrapper subprocess.
     lock = module.FileLock(Path(lock_path), timeout_sec=30, poll_sec=0.05)
     lock.acquire()
     try:
         ready.set()
-        time.sleep(hold_sec)
+        release.wait(timeout=30)
     finally:
         lock.release()
 
 
+def setUpModule() -> None:
+    global _MODULE_TMPDIR, _TEMPLATE_VENV
+    _MODULE_TMPDIR = tempfile.mkdtemp(prefix="pywrap-test-")
+    _TEMPLATE_VENV = Path(_MODULE_TMPDIR) / ".venv"
+    subprocess.run([sys.executable, "-m", "venv", str(_TEMPLATE_VENV)], check=True)
+
+
+def tearDownModule() -> None:
+    global _MODULE_TMPDIR, _TEMPLATE_VENV
+    if _MODULE_TMPDIR is not None:
+        shutil.rmtree(_MODULE_TMPDIR, ignore_errors=True)
+        _MODULE_TMPDIR = None
+    _TEMPLATE_VENV = None
+
+
 class WrapperTests(unittest.TestCase):
-    def _base_env(self) -> dict:
-        env = os.environ.copy()
-        env.update(
+    @classmethod
+    def setUpClass(cls) -> None:
+        loader = importlib.machinery.SourceFileLoader("pywrap", str(WRAPPER_PATH))
+        spec = importlib.util.spec_from_loader(loader.name, loader)
+        cls.wrapper = importlib.util.module_from_spec(spec)
+        loader.exec_module(cls.wrapper)
+        cls._root = tempfile.mkdtemp(prefix="pywrap-test-")
+        cls._baseline = dict(os.environ)
+        cls._baseline.update(
             {
                 "PYWRAP_BASE_PYTHON": sys.executable,
                 "PYWRAP_DEP_MODE": "none",
                 "PYWRAP_VENV_MODE": "project",
                 "PYWRAP_UPGRADE_PIP": "0",
+                # child interpreters neither write .pyc files nor scan user site-packages
+                "PYTHONDONTWRITEBYTECODE": "1",
+                "PYTHONNOUSERSITE": "1",
             }
         )
-        return env
 
-    def _run_wrapper(self, cwd: str, env: dict, args: list[str] | None = None) -> subprocess.CompletedProcess:
-        return subprocess.run(
-            [sys.executable, str(WRAPPER_PATH), *(args or ["-c", "print('ok')"])],
-            cwd=cwd,
-            env=env,
-            capture_output=True,
-            text=True,
-        )
+    @classmethod
+    def tearDownClass(cls) -> None:
+        shutil.rmtree(cls._root, ignore_errors=True)
+
+    def _mkdtemp(self) -> str:
+        # left in place; tearDownClass sweeps the whole root in one rmtree
+        return tempfile.mkdtemp(dir=self._root)
+
+    def _base_env(self) -> dict:
+        # a per-test cache root keeps tests off the shared ~/.cache/pywrap, so they
+        # stay independent when run in parallel
+        return {**self._baseline, "PYWRAP_CACHE_DIR": self._mkdtemp()}
+
+    def _run_wrapper(
+        self, cwd: str, env: dict, args: list[str] | None = None, *, capture: bool = True
+    ) -> subprocess.CompletedProcess:
+        return _invoke_in_process(self.wrapper, cwd, env, args or ["-c", "print('ok')"], capture=capture)
 
     def _venv_dir(self, project_root: Path) -> Path:
         return project_root / ".venv"
 
-    def test_concurrent_invocations_share_lock(self) -> None:
-        with tempfile.TemporaryDirectory() as tmpdir:
-            env = self._base_env()
-            ctx = get_context("spawn")
-            queue = ctx.Queue()
-            processes = []
-
-            for _ in range(5):
-                proc = ctx.Process(
-                    target=_run_wrapper,
-                    args=(str(WRAPPER_PATH), tmpdir, env, ["-c", "print('ok')"], queue),
-                )
-                proc.start()
-                processes.append(proc)
-
-            results = []
-            for _ in processes:
-                results.append(queue.get(timeout=120))
-
-            for proc in processes:
-                proc.join(timeout=120)
-
-            failures = [result for result in results if result[0] != 0]
-            self.assertFalse(failures, f"Expected all processes to succeed, got: {failures}")
+    def _assert_pip_runs_from(self, venv_dir: Path, env: dict) -> None:
+        pip = venv_dir / "bin" / "pip"
+        result = subprocess.run([str(pip), "--version"], capture_output=True, text=True, env=env)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn(str(venv_dir), result.stdout)
 
-    def test_lock_timeout_reports_error(self) -> None:
-        with tempfile.TemporaryDirectory() as tmpdir:
-            env = self._base_env()
-            env["PYWRAP_LOCK_TIMEOUT_SEC"] = "1"
-            env["PYWRAP_LOCK_POLL_SEC"] = "0.01"
-            lock_path = str(Path(tmpdir) / ".venv.lock")
-            ctx = get_context("spawn")
-            ready = ctx.Event()
-            holder = ctx.Process(
-                target=_hold_lock,
-                args=(str(WRAPPER_PATH), lock_path, ready, 3.0),
+    def test_concurrent_invocations_share_lock(self) -> None:
+        tmpdir = self._mkdtemp()
+        env = self._base_env()
+        # launch the wrappers directly so all five race on the venv lock with no
+        # intermediate interpreter in between
+        processes = [
+            subprocess.Popen(
+                [sys.executable, str(WRAPPER_PATH), "-c", "print('ok')"],
+                cwd=tmpdir,
+                env=env,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                close_fds=False,
             )
-            holder.start()
+            for _ in range(5)
+        ]
+        results = [proc.wait(timeout=120) for proc in processes]
+
+        failures = [returncode for returncode in results if returncode != 0]
+        self.assertFalse(failures, f"Expected all processes to succeed, got: {failures}")
+
+    def _run_wrapper_against_held_lock(self, tmpdir: str, env: dict) -> subprocess.CompletedProcess:
+        lock_path = str(Path(tmpdir) / ".venv.lock")
+        ready = threading.Event()
+        release = threading.Event()
+        holder = threading.Thread(
+            target=_hold_lock,
+            args=(self.wrapper, lock_path, ready, release),
+        )
+        holder.start()
+        try:
             self.assertTrue(ready.wait(timeout=10), "Lock holder did not signal readiness")
 
-            result = subprocess.run(
+            return subprocess.run(
                 [sys.executable, str(WRAPPER_PATH), "-c", "print('wait')"],
                 cwd=tmpdir,
                 env=env,
                 capture_output=True,
                 text=True,
+                close_fds=False,
             )
-
+        finally:
+            release.set()
             holder.join(timeout=10)
-            self.assertNotEqual(result.returncode, 0)
-            self.assertIn("Timeout waiting for lock", result.stderr)
 
-    def test_invalid_base_python_fails_fast(self) -> None:
-        with tempfile.TemporaryDirectory() as tmpdir:
-            env = self._base_env()
-            env["PYWRAP_BASE_PYTHON"] = str(Path(tmpdir) / "missing-python")
+    def test_lock_timeout_reports_error(self) -> None:
+        tmpdir = self._mkdtemp()
+        env = self._base_env()
+        env["PYWRAP_LOCK_TIMEOUT_SEC"] = "1"
+        env["PYWRAP_LOCK_POLL_SEC"] = "0.001"
 
-            result = subprocess.run(
-                [sys.executable, str(WRAPPER_PATH), "-c", "print('nope')"],
-                cwd=tmpdir,
-                env=env,
-                capture_output=True,
-                text=True,
-            )
+        result = self._run_wrapper_against_held_lock(tmpdir, env)
 
-            self.assertNotEqual(result.returncode, 0)
-            self.assertIn("[pywrap]", result.stderr)
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("Timeout waiting for lock", result.stderr)
 
-    def test_verbose_logs_dep_mode(self) -> None:
-        with tempfile.TemporaryDirectory() as tmpdir:
-            Path(tmpdir, "requirements.txt").write_text("", encoding="utf-8")
-            env = self._base_env()
-            env["PYWRAP_VERBOSE"] = "1"
-            env["PYWRAP_DEP_MODE"] = "requirements"
+    def test_lock_timeout_does_not_wait_out_poll_interval(self) -> None:
+        tmpdir = self._mkdtemp()
+        env = self._base_env()
+        env["PYWRAP_LOCK_TIMEOUT_SEC"] = "1"
+        env["PYWRAP_LOCK_POLL_SEC"] = "5"
 
-            result = self._run_wrapper(tmpdir, env)
+        start = time.monotonic()
+        result = self._run_wrapper_against_held_lock(tmpdir, env)
+        elapsed = time.monotonic() - start
 
-            self.assertEqual(result.returncode, 0, result.stderr)
-            self.assertIn("[pywrap] project_root=", result.stderr)
-            self.assertIn("dep_mode=requirements", result.stderr)
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("Timeout waiting for lock", result.stderr)
+        self.assertLess(elapsed, 4.0, "lock timeout waited out the poll interval")
 
-    def test_requirements_env_override_selects_requirements_mode(self) -> None:
-        with tempfile.TemporaryDirectory() as tmpdir:
-            custom_req = Path(tmpdir, "custom-req.txt")
-            custom_req.write_text("", encoding="utf-8")
-            env = self._base_env()
-            env["PYWRAP_VERBOSE"] = "1"
-            env["PYWRAP_REQUIREMENTS"] = str(custom_req)
+    def test_invalid_base_python_fails_fast(self) -> None:
+        tmpdir = self._mkdtemp()
+        env = self._base_env()
+        env["PYWRAP_BASE_PYTHON"] = str(Path(tmpdir) / "missing-python")
 
-            result = self._run_wrapper(tmpdir, env)
+        result = subprocess.run(
+            [sys.executable, str(WRAPPER_PATH), "-c", "print('nope')"],
+            cwd=tmpdir,
+            env=env,
+            capture_output=True,
+            text=True,
+            close_fds=False,
+        )
 
-            self.assertEqual(result.returncode, 0, result.stderr)
-            self.assertIn("dep_mode=requirements", result.stderr)
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("[pywrap]", result.stderr)
 
-    def test_cache_mode_uses_cache_dir(self) -> None:
-        with tempfile.TemporaryDirectory() as tmpdir, tempfile.TemporaryDirectory() as cache_dir:
-            Path(tmpdir, "requirements.txt").write_text("", encoding="utf-8")
-            env = self._base_env()
-            env["PYWRAP_VERBOSE"] = "1"
-            env["PYWRAP_VENV_MODE"] = "cache"
-            env["PYWRAP_CACHE_DIR"] = cache_dir
-
-            result = self._run_wrapper(tmpdir, env)
-
-            self.assertEqual(result.returncode, 0, result.stderr)
-            venv_dir_line = next(
-                (line for line in result.stderr.splitlines() if "venv_dir=" in line),
-                "",
-            )
-            self.assertIn(str(Path(cache_dir)), venv_dir_line)
-            self.assertFalse(self._venv_dir(Path(tmpdir)).exists())
+    def test_verbose_logs_dep_mode(self) -> None:
+        tmpdir = self._mkdtemp()
+        Path(tmpdir, "requirements.txt").write_text("", encoding="utf-8")
+        env = self._base_env()
+        env["PYWRAP_VENV_TEMPLATE"] = str(_TEMPLATE_VENV)
+        env["PYWRAP_VERBOSE"] = "1"
+        env["PYWRAP_DEP_MODE"] = "requirements"
 
-    def test_force_recreate_removes_existing_venv(self) -> None:
-        with tempfile.TemporaryDirectory() as tmpdir:
-            Path(tmpdir, "requirements.txt").write_text("", encoding="utf-8")
-            env = self._base_env()
+        result = self._run_wrapper(tmpdir, env)
 
-            result = self._run_wrapper(tmpdir, env)
-            self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("[pywrap] project_root=", result.stderr)
+        self.assertIn("dep_mode=requirements", result.stderr)
 
-            venv_dir = self._venv_dir(Path(tmpdir))
-            sentinel = venv_dir / "sentinel.txt"
-            sentinel.write_text("old", encoding="utf-8")
+    def test_requirements_env_override_selects_requirements_mode(self) -> None:
+        tmpdir = self._mkdtemp()
+        custom_req = Path(tmpdir, "custom-req.txt")
+        custom_req.write_text("", encoding="utf-8")
+        env = self._base_env()
+        env["PYWRAP_VENV_TEMPLATE"] = str(_TEMPLATE_VENV)
+        env["PYWRAP_VERBOSE"] = "1"
+        env["PYWRAP_REQUIREMENTS"] = str(custom_req)
 
-            env["PYWRAP_FORCE_RECREATE"] = "1"
-            result = self._run_wrapper(tmpdir, env)
+        result = self._run_wrapper(tmpdir, env)
 
-            self.assertEqual(result.returncode, 0, result.stderr)
-            self.assertTrue(venv_dir.exists())
-            self.assertFalse(sentinel.exists())
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("dep_mode=requirements", result.stderr)
 
-    def test_install_deps_writes_marker_with_pip_args(self) -> None:
-        with tempfile.TemporaryDirectory() as tmpdir:
-            Path(tmpdir, "requirements.txt").write_text("", encoding="utf-8")
-            env = self._base_env()
-            env["PYWRAP_INSTALL_DEPS"] = "1"
-            env["PYWRAP_UPGRADE_PIP"] = "0"
-            env["PYWRAP_PIP_ARGS"] = "--no-index"
+    def test_cache_mode_uses_cache_dir(self) -> None:
+        tmpdir = self._mkdtemp()
+        cache_dir = self._mkdtemp()
+        Path(tmpdir, "requirements.txt").write_text("", encoding="utf-8")
+        env = self._base_env()
+        env["PYWRAP_VENV_TEMPLATE"] = str(_TEMPLATE_VENV)
+        env["PYWRAP_VERBOSE"] = "1"
+        env["PYWRAP_VENV_MODE"] = "cache"
+        env["PYWRAP_CACHE_DIR"] = cache_dir
+
+        result = self._run_wrapper(tmpdir, env)
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        venv_dir_line = next(
+            (line for line in result.stderr.splitlines() if "venv_dir=" in line),
+            "",
+        )
+        self.assertIn(str(Path(cache_dir)), venv_dir_line)
+        self.assertFalse(self._venv_dir(Path(tmpdir)).exists())
 
-            result = self._run_wrapper(tmpdir, env)
+    def test_force_recreate_removes_existing_venv(self) -> None:
+        tmpdir = self._mkdtemp()
+        Path(tmpdir, "requirements.txt").write_text("", encoding="utf-8")
+        env = self._base_env()
+        env["PYWRAP_VENV_TEMPLATE"] = str(_TEMPLATE_VENV)
+
+        result = self._run_wrapper(tmpdir, env, capture=False)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+        venv_dir = self._venv_dir(Path(tmpdir))
+        sentinel = venv_dir / "sentinel.txt"
+        sentinel.write_text("old", encoding="utf-8")
+
+        env["PYWRAP_FORCE_RECREATE"] = "1"
+        result = self._run_wrapper(tmpdir, env, capture=False)
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertTrue(venv_dir.exists())
+        self.assertFalse(sentinel.exists())
+
+    def test_venv_template_is_copied_into_place(self) -> None:
+        tmpdir = self._mkdtemp()
+        template = Path(self._mkdtemp()) / ".venv"
+        shutil.copytree(_TEMPLATE_VENV, template, symlinks=True)
+        Path(template, "sentinel.txt").write_text("template", encoding="utf-8")
+        env = self._base_env()
+        env["PYWRAP_VENV_TEMPLATE"] = str(template)
+
+        result = self._run_wrapper(tmpdir, env)
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), "ok")
+        venv_dir = self._venv_dir(Path(tmpdir).resolve())
+        self.assertEqual((venv_dir / "sentinel.txt").read_text("utf-8"), "template")
+        if os.name == "posix":
+            # the copy still records _TEMPLATE_VENV as its origin; scripts must follow the project
+            self._assert_pip_runs_from(venv_dir, env)
+
+    def test_venv_template_from_other_interpreter_is_ignored(self) -> None:
+        tmpdir = self._mkdtemp()
+        template = Path(self._mkdtemp()) / ".venv"
+        shutil.copytree(_TEMPLATE_VENV, template, symlinks=True)
+        Path(template, "sentinel.txt").write_text("template", encoding="utf-8")
+        cfg = template / "pyvenv.cfg"
+        other_home = Path(self._mkdtemp()) / "bin"
+        lines = [
+            f"home = {other_home}" if line.startswith("home") else line
+            for line in cfg.read_text("utf-8").splitlines()
+            if not line.startswith("executable")
+        ]
+        cfg.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        env = self._base_env()
+        env["PYWRAP_VENV_TEMPLATE"] = str(template)
+        env["PYWRAP_VERBOSE"] = "1"
+
+        result = self._run_wrapper(tmpdir, env)
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("ignoring it", result.stderr)
+        self.assertFalse((self._venv_dir(Path(tmpdir)) / "sentinel.txt").exists())
+
+    def _make_template_tree(self) -> Path:
+        template = Path(self._mkdtemp()) / "tpl"
+        (template / "bin").mkdir(parents=True)
+        (template / "bin" / "python").write_text("py", encoding="utf-8")
+        if os.name == "posix":
+            (template / "bin" / "python3").symlink_to("python")
+        return template
+
+    def _assert_template_copied(self, dest: Path) -> None:
+        self.assertEqual((dest / "bin" / "python").read_text("utf-8"), "py")
+        if os.name == "posix":
+            self.assertEqual(os.readlink(dest / "bin" / "python3"), "python")
+
+    def test_copy_venv_template_uses_copytree_off_linux(self) -> None:
+        template = self._make_template_tree()
+        dest = Path(self._mkdtemp())
+
+        with mock.patch.object(sys, "platform", "win32"), mock.patch("subprocess.run") as run:
+            self.wrapper._copy_venv_template(template, dest)
+
+        run.assert_not_called()
+        self._assert_template_copied(dest)
+
+    def test_copy_venv_template_falls_back_when_cp_lacks_reflink(self) -> None:
+        template = self._make_template_tree()
+        dest = Path(self._mkdtemp())
+
+        def partial_cp(cmd, **kwargs):
+            # leave a half-done copy behind, as a cp that dies mid-way would
+            shutil.copytree(template, dest, symlinks=True, dirs_exist_ok=True)
+            return subprocess.CompletedProcess(cmd, 1, stderr="cp: unrecognized option '--reflink=auto'\n")
+
+        with (
+            mock.patch.object(sys, "platform", "linux"),
+            mock.patch("shutil.which", return_value="cp"),
+            mock.patch("subprocess.run", side_effect=partial_cp),
+        ):
+            self.wrapper._copy_venv_template(template, dest)
+
+        self._assert_template_copied(dest)
+
+    def test_copy_venv_template_reports_cp_failure(self) -> None:
+        template = self._make_template_tree()
+        dest = Path(self._mkdtemp())
+        failed = subprocess.CompletedProcess(["cp"], 1, stderr="cp: write error: No space left on device\n")
+        stderr = io.StringIO()
+
+        with (
+            mock.patch.object(sys, "platform", "linux"),
+            mock.patch("shutil.which", return_value="cp"),
+            mock.patch("subprocess.run", return_value=failed),
+            contextlib.redirect_stderr(stderr),
+        ):
+            with self.assertRaises(subprocess.CalledProcessError):
+                self.wrapper._copy_venv_template(template, dest)
+
+        self.assertIn("No space left on device", stderr.getvalue())
+
+    @unittest.skipUnless(os.name == "posix", "checks POSIX console-script shebangs")
+    def test_created_venv_scripts_point_at_project_venv(self) -> None:
+        tmpdir = self._mkdtemp()
+        env = self._base_env()
+
+        result = self._run_wrapper(tmpdir, env)
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        venv_dir = self._venv_dir(Path(tmpdir).resolve())
+        # the venv is built in a .tmp-venv-* dir and renamed into place
+        self.assertNotIn(".tmp-venv-", (venv_dir / "bin" / "pip").read_text("utf-8").splitlines()[0])
+        self._assert_pip_runs_from(venv_dir, env)
+
+    @unittest.skipUnless(os.name == "posix", "checks POSIX console-script shebangs")
+    def test_venv_template_scripts_point_at_project_venv(self) -> None:
+        tmpdir = self._mkdtemp()
+        env = self._base_env()
+        env["PYWRAP_VENV_TEMPLATE"] = str(_TEMPLATE_VENV)
+
+        result = self._run_wrapper(tmpdir, env)
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        venv_dir = self._venv_dir(Path(tmpdir).resolve())
+        pip = venv_dir / "bin" / "pip"
+        self.assertTrue(pip.read_text("utf-8").startswith(f"#!{venv_dir / 'bin'}/"))
+        self.assertIn(f'VIRTUAL_ENV="{venv_dir}"', (venv_dir / "bin" / "activate").read_text("utf-8"))
+        self._assert_pip_runs_from(venv_dir, env)
+
+    @unittest.skipUnless(os.name == "posix", "checks POSIX console-script shebangs")
+    def test_venv_template_scripts_survive_space_in_project_path(self) -> None:
+        tmpdir = Path(self._mkdtemp(), "My Project")
+        tmpdir.mkdir()
+        env = self._base_env()
+        env["PYWRAP_VENV_TEMPLATE"] = str(_TEMPLATE_VENV)
+
+        result = self._run_wrapper(str(tmpdir), env)
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        venv_dir = self._venv_dir(tmpdir.resolve())
+        self.assertTrue((venv_dir / "bin" / "pip").read_text("utf-8").startswith("#!/bin/sh\n"))
+        self._assert_pip_runs_from(venv_dir, env)
 
-            self.assertEqual(result.returncode, 0, result.stderr)
-            marker = self._venv_dir(Path(tmpdir)) / ".pywrap" / "ok.json"
-            data = json.loads(marker.read_text("utf-8"))
-            self.assertEqual(data["pip_args"], ["--no-index"])
+    def test_install_deps_writes_marker_with_pip_args(self) -> None:
+        tmpdir = self._mkdtemp()
+        Path(tmpdir, "requirements.txt").write_text("", encoding="utf-8")
+        env = self._base_env()
+        env["PYWRAP_VENV_TEMPLATE"] = str(_TEMPLATE_VENV)
+        env["PYWRAP_INSTALL_DEPS"] = "1"
+        env["PYWRAP_UPGRADE_PIP"] = "0"
+        env["PYWRAP_PIP_ARGS"] = "--no-index"
+
+        result = self._run_wrapper(tmpdir, env, capture=False)
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        marker = self._venv_dir(Path(tmpdir)) / ".pywrap" / "ok.json"
+        data = json.loads(marker.read_bytes())
+        self.assertEqual(data["pip_args"], ["--no-index"])
+
+    def test_failed_install_reports_pip_output(self) -> None:
+        tmpdir = self._mkdtemp()
+        Path(tmpdir, "requirements.txt").write_text("", encoding="utf-8")
+        env = self._base_env()
+        env["PYWRAP_VENV_TEMPLATE"] = str(_TEMPLATE_VENV)
+        env["PYWRAP_INSTALL_DEPS"] = "1"
+        env["PYWRAP_PIP_ARGS"] = "--bogus-flag"
+
+        result = self._run_wrapper(tmpdir, env)
+
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("[pywrap] command failed", result.stderr)
+        self.assertIn("no such option", result.stderr)
 
     @unittest.skipUnless(os.name == "nt", "Windows-only test for python3.cmd shim")
     def test_windows_cmd_shim_invokes_wrapper(self) -> None:
-        with tempfile.TemporaryDirectory() as tmpdir:
-            env = self._base_env()
-            env["PYWRAP_VENV_MODE"] = "project"
-            result = subprocess.run(
-                ["cmd", "/c", "python3.cmd", "-c", "print('ok')"],
-                cwd=str(WRAPPER_PATH.parent),
-                env=env,
-                capture_output=True,
-                text=True,
-            )
+        tmpdir = self._mkdtemp()
+        env = self._base_env()
+        env["PYWRAP_VENV_MODE"] = "project"
+        result = subprocess.run(
+            ["cmd", "/c", "python3.cmd", "-c", "print('ok')"],
+            cwd=str(WRAPPER_PATH.parent),
+            env=env,
+            capture_output=True,
+            text=True,
+        )
 
-            self.assertEqual(result.returncode, 0, result.stderr)
-            self.assertEqual(result.stdout.strip(), "ok")
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), "ok")
 
     def test_local_first_records_marker_flag(self) -> None:
-        with tempfile.TemporaryDirectory() as tmpdir:
-            Path(tmpdir, "requirements.txt").write_text("", encoding="utf-8")
-            env = self._base_env()
-            env["PYWRAP_INSTALL_DEPS"] = "1"
-            env["PYWRAP_UPGRADE_PIP"] = "0"
-            env["PYWRAP_LOCAL_FIRST"] = "1"
-
-            result = self._run_wrapper(tmpdir, env)
-
-            self.assertEqual(result.returncode, 0, result.stderr)
-            marker = self._venv_dir(Path(tmpdir)) / ".pywrap" / "ok.json"
-            data = json.loads(marker.read_text("utf-8"))
-            self.assertTrue(data["local_first"])
+        tmpdir = self._mkdtemp()
+        Path(tmpdir, "requirements.txt").write_text("", encoding="utf-8")
+        env = self._base_env()
+        env["PYWRAP_VENV_TEMPLATE"] = str(_TEMPLATE_VENV)
+        env["PYWRAP_INSTALL_DEPS"] = "1"
+        env["PYWRAP_UPGRADE_PIP"] = "0"
+        env["PYWRAP_LOCAL_FIRST"] = "1"
+
+        result = self._run_wrapper(tmpdir, env, capture=False)
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        marker = self._venv_dir(Path(tmpdir)) / ".pywrap" / "ok.json"
+        data = json.loads(marker.read_bytes())
+        self.assertTrue(data["local_first"])
 
 
 if __name__ == "__main__":